@@ -7,12 +7,22 @@ if ROOT not in sys.path:
 
 import streamlit as st
 
-from src.predict import predict_point
-from src.render_map import render_map
-from src.config import MAPS_DIR
+from src.point_cache import cached_predict_point
+from src.render_queue import RenderQueue
+from src.config import MAPS_DIR, RISK_SURFACE_TIF
 from src.rag_answer import explain
 
 
+@st.cache_resource
+def _render_queue():
+    # One pool shared by all sessions, so identical in-flight renders are deduplicated
+    return RenderQueue(workers=2, max_pending=8)
+
+
+# Streamlit 1.36 ships fragments as experimental; later versions promote them
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+
 st.set_page_config(page_title="Local Multi-Hazard Risk", layout="wide")
 st.title("Local Multi-Hazard Risk (Open Sample Data + Local RAG)")
 
@@ -24,21 +34,41 @@ with left:
 
     if st.button("Analyze"):
         with st.spinner("Analyzing site..."):
-            feats, label = predict_point(lon, lat)
-            img = MAPS_DIR / f"site_{lon:.4f}_{lat:.4f}.png"
-            # pass label into map so marker color matches risk
-            render_map(lon, lat, label, str(img))
-            st.session_state["feats"] = feats
-            st.session_state["label"] = label
-            st.session_state["img"] = str(img)
+            feats, label = cached_predict_point(lon, lat)
+        img = MAPS_DIR / f"site_{lon:.4f}_{lat:.4f}.png"
+        MAPS_DIR.mkdir(parents=True, exist_ok=True)
+        # render in the background; pass label into map so marker color matches risk
+        st.session_state["render"] = _render_queue().submit(lon, lat, label, str(img), surface=RISK_SURFACE_TIF)
+        st.session_state["render_done"] = False
+        st.session_state["feats"] = feats
+        st.session_state["label"] = label
+        st.session_state["img"] = str(img)
+
+
+@_fragment(run_every=1.0)
+def _poll_render():
+    # Only called while a render is pending; once done, the full-app rerun shows the
+    # image outside this fragment, so polling stops
+    if st.session_state["render"].done():
+        st.session_state["render_done"] = True
+        st.rerun()
+    st.caption("Rendering local map...")
 
 with right:
     if "img" in st.session_state:
-        st.image(
-            st.session_state["img"],
-            caption="Local context around the selected location",
-            use_column_width=True,
-        )
+        fut = st.session_state.get("render")
+        if fut is None:
+            st.info("The map renderer is busy right now; press Analyze again in a moment.")
+        elif not st.session_state.get("render_done"):
+            _poll_render()
+        elif fut.exception() is not None:
+            st.warning(f"Map rendering failed: {fut.exception()}")
+        else:
+            st.image(
+                st.session_state["img"],
+                caption="Local context around the selected location",
+                use_column_width=True,
+            )
 
 st.markdown("---")
 
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE = Path(__file__).resolve().parents[1]
@@ -9,6 +10,7 @@ RAG_INDEX_DIR  = BASE / "rag_index"
 MODELS_DIR     = BASE / "models"
 OUTPUT_DIR     = BASE / "output"
 MAPS_DIR       = OUTPUT_DIR / "maps"
+SURFACE_DIR    = OUTPUT_DIR / "surface"
 
 # Processed files used by the app
 FEMA_GPKG      = DATA_PROCESSED / "fema_nfhl.gpkg"     # flood-like polygons (FLD_ZONE)
@@ -18,6 +20,20 @@ NOAA_STORMS_GP = DATA_PROCESSED / "noaa_storms.gpkg"   # storm points
 
 MODEL_PKL = MODELS_DIR / "model.pkl"
 
+# RAG retrieval backend: "numpy" (in-process, src/vector_index.py) or "chroma"
+RAG_BACKEND = os.environ.get("HAZARD_RAG_BACKEND", "numpy")
+RAG_HYBRID  = os.environ.get("HAZARD_RAG_HYBRID", "0") == "1"  # blend BM25 into numpy ranking
+RAG_VECTORS = RAG_INDEX_DIR / "vectors.npy"   # normalized chunk embeddings
+RAG_CHUNKS  = RAG_INDEX_DIR / "chunks.json"   # chunk ids, text and hazard tags
+
+# Whole-region risk surface (see src/risk_surface.py)
+RISK_SURFACE_TIF = SURFACE_DIR / "risk_surface.tif"
+
+# Point-query memoization (see src/point_cache.py); set POINT_CACHE_DB = None for memory only
+POINT_CACHE_DB        = OUTPUT_DIR / "point_cache.sqlite"
+POINT_CACHE_PRECISION = 8      # geohash chars (~38 m x 19 m cells)
+POINT_CACHE_SIZE      = 4096   # in-memory LRU entries
+
 # Davis bbox: (minx, miny, maxx, maxy)
 DAVIS_BBOX = (-118.9, 33.6, -117.7, 34.5)
 
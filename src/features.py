@@ -1,61 +1,79 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point
 from .config import FEMA_GPKG, CALFIRE_GPKG, USGS_PGA_GPKG, NOAA_STORMS_GP
+from .geodesy import count_within
 from .schema_map import SCHEMA
 
-def _load():
-    return (
-        gpd.read_file(FEMA_GPKG),
-        gpd.read_file(CALFIRE_GPKG),
-        gpd.read_file(USGS_PGA_GPKG),
-        gpd.read_file(NOAA_STORMS_GP)
-    )
+LAYER_FILES = (FEMA_GPKG, CALFIRE_GPKG, USGS_PGA_GPKG, NOAA_STORMS_GP)
 
-def extract_point(lon: float, lat: float) -> dict:
-    fema, cal, usgs, storms = _load()
-    pt = gpd.GeoDataFrame(geometry=[Point(lon, lat)], crs="EPSG:4326")
+# Hazard layers plus storm coordinates kept as plain arrays for distance queries
+Layers = namedtuple("Layers", "fema cal usgs storms storm_lon storm_lat")
 
-    # FEMA zone
-    try:
-        j = gpd.sjoin(pt, fema, how="left", predicate="intersects") if not fema.empty else pt.assign(FLD_ZONE=None)
-        fema_zone = j.get(SCHEMA["fema"]["zone_col"], pd.Series([None])).iloc[0]
-    except Exception:
-        fema_zone = None
+def layer_fingerprint() -> tuple:
+    """(name, mtime_ns, size) for each layer file; changes whenever a layer is rebuilt."""
+    out = []
+    for p in LAYER_FILES:
+        st = p.stat() if p.exists() else None
+        out.append((p.name, st and st.st_mtime_ns, st and st.st_size))
+    return tuple(out)
 
-    # CALFIRE hazard
+@lru_cache(maxsize=1)
+def _load_cached(fingerprint):
+    fema, cal, usgs, storms = (gpd.read_file(p) for p in LAYER_FILES)
     try:
-        j = gpd.sjoin(pt, cal, how="left", predicate="intersects") if not cal.empty else pt.assign(HAZ_CLASS=None)
-        fire_class = j.get(SCHEMA["calfire"]["hazard_col"], pd.Series([None])).iloc[0]
+        s = storms.to_crs(4326).geometry
+        storm_lon, storm_lat = s.x.to_numpy(), s.y.to_numpy()
     except Exception:
-        fire_class = None
+        storm_lon = storm_lat = np.empty(0)
+    return Layers(fema, cal, usgs, storms, storm_lon, storm_lat)
 
-    # USGS PGA
-    try:
-        j = gpd.sjoin(pt, usgs, how="left", predicate="intersects") if not usgs.empty else pt.assign(PGA_G=None)
-        pga = j.get(SCHEMA["usgs_pga"]["value_col"], pd.Series([None])).iloc[0]
-        pga = float(pga) if pga is not None and not pd.isna(pga) else None
-    except Exception:
-        pga = None
+def load_layers():
+    """Hazard layers, read once and reused until a layer file changes on disk."""
+    return _load_cached(layer_fingerprint())
 
-    # Storm frequency within 5 km (project to meters for accurate distance)
+def _join_first(pts, layer, col):
+    """Attribute of the first `layer` feature intersecting each point (None if none)."""
     try:
-        if storms.empty:
-            storm_count_5km = 0
-        else:
-            storms_m = storms.to_crs(3857)
-            pt_m = pt.to_crs(3857)
-            dists_m = storms_m.geometry.distance(pt_m.geometry.iloc[0])
-            storm_count_5km = int((dists_m <= 5000).sum())
+        if layer.empty or col not in layer.columns:
+            return pd.Series([None] * len(pts), index=pts.index, dtype=object)
+        j = gpd.sjoin(pts, layer[[col, "geometry"]], how="left", predicate="intersects")
+        vals = j[~j.index.duplicated(keep="first")][col].reindex(pts.index)
+        return vals.astype(object).where(vals.notna(), None)
     except Exception:
-        storm_count_5km = 0
+        return pd.Series([None] * len(pts), index=pts.index, dtype=object)
 
+def extract_points(lons, lats) -> pd.DataFrame:
+    """Batch version of `extract_point`: one spatial join per layer for all points."""
+    L = load_layers()
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    pts = gpd.GeoDataFrame(geometry=gpd.points_from_xy(lons, lats), crs="EPSG:4326")
+
+    fema_zone = _join_first(pts, L.fema, SCHEMA["fema"]["zone_col"])
+    fire_class = _join_first(pts, L.cal, SCHEMA["calfire"]["hazard_col"])
+    pga = pd.to_numeric(_join_first(pts, L.usgs, SCHEMA["usgs_pga"]["value_col"]), errors="coerce")
+
+    return pd.DataFrame({
+        "lon": lons,
+        "lat": lats,
+        "fema_zone": fema_zone.map(lambda v: None if v is None else str(v)),
+        "fire_class": fire_class.map(lambda v: None if v is None else str(v)),
+        "pga_g": pga.astype(float),
+        # Storm frequency within 5 km (geodesic distance on the WGS84 ellipsoid)
+        "storm_count_5km": count_within(lons, lats, L.storm_lon, L.storm_lat, 5000),
+    })
+
+def extract_point(lon: float, lat: float) -> dict:
+    row = extract_points([lon], [lat]).iloc[0]
     return {
         "lon": lon,
         "lat": lat,
-        "fema_zone": None if pd.isna(fema_zone) else str(fema_zone),
-        "fire_class": None if pd.isna(fire_class) else str(fire_class),
-        "pga_g": pga,
-        "storm_count_5km": storm_count_5km,
+        "fema_zone": row["fema_zone"],
+        "fire_class": row["fire_class"],
+        "pga_g": None if pd.isna(row["pga_g"]) else float(row["pga_g"]),
+        "storm_count_5km": int(row["storm_count_5km"]),
     }
-
@@ -16,6 +16,7 @@ from .config import (
     DATA_RAW, DATA_PROCESSED, DAVIS_BBOX,
     FEMA_GPKG, CALFIRE_GPKG, USGS_PGA_GPKG, NOAA_STORMS_GP
 )
+from .geodesy import to_local, buffer_points
 
 DATA_RAW.mkdir(parents=True, exist_ok=True)
 DATA_PROCESSED.mkdir(parents=True, exist_ok=True)
@@ -63,13 +64,13 @@ def build_fema_like_from_osm():
         gpd.GeoDataFrame({"FLD_ZONE":[]}, geometry=[], crs="EPSG:4326").to_file(FEMA_GPKG, driver="GPKG")
         return
 
-    water = gpd.GeoDataFrame(geometry=geoms, crs="EPSG:4326").to_crs(3857)  # meters
+    water = to_local(gpd.GeoDataFrame(geometry=geoms, crs="EPSG:4326"))  # true meters
     # buffer in meters (approx 300 m and 600 m rings)
     near_m = unary_union(water.buffer(300))
     far_m  = unary_union(water.buffer(600))
 
-    a = gpd.GeoDataFrame({"FLD_ZONE":["A"]}, geometry=[near_m], crs=3857)
-    x = gpd.GeoDataFrame({"FLD_ZONE":["X"]}, geometry=[far_m.difference(near_m)], crs=3857)
+    a = gpd.GeoDataFrame({"FLD_ZONE":["A"]}, geometry=[near_m], crs=water.crs)
+    x = gpd.GeoDataFrame({"FLD_ZONE":["X"]}, geometry=[far_m.difference(near_m)], crs=water.crs)
 
     out = pd.concat([a, x], ignore_index=True).to_crs(4326)
     out.to_file(FEMA_GPKG, driver="GPKG")
@@ -126,10 +127,10 @@ def _fire_from_osm_forest_proxy():
             pass
     if not geoms:
         return gpd.GeoDataFrame({"HAZ_CLASS":[]}, geometry=[], crs="EPSG:4326")
-    gdf = gpd.GeoDataFrame(geometry=geoms, crs="EPSG:4326").to_crs(3857)
+    gdf = to_local(gpd.GeoDataFrame(geometry=geoms, crs="EPSG:4326"))
     poly = unary_union(gdf.buffer(100))  # small edge buffer, meters
     if isinstance(poly, (Polygon, MultiPolygon)):
-        out = gpd.GeoDataFrame({"HAZ_CLASS":["High"]}, geometry=[poly], crs=3857).to_crs(4326)
+        out = gpd.GeoDataFrame({"HAZ_CLASS":["High"]}, geometry=[poly], crs=gdf.crs).to_crs(4326)
         return out
     return gpd.GeoDataFrame({"HAZ_CLASS":[]}, geometry=[], crs="EPSG:4326")
 
@@ -153,7 +154,7 @@ def build_fire_from_firms():
         gpd.GeoDataFrame({"HAZ_CLASS":[]}, geometry=[], crs="EPSG:4326").to_file(CALFIRE_GPKG, driver="GPKG")
         return
 
-    g = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df.longitude, df.latitude), crs="EPSG:4326").to_crs(3857)
+    g = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df.longitude, df.latitude), crs="EPSG:4326")
 
     # buffer in meters (scale 300–800 m if brightness exists; else constant 500 m)
     if "bright_ti4" in df.columns and df["bright_ti4"].notna().any():
@@ -161,12 +162,11 @@ def build_fire_from_firms():
         rad_m = np.interp(b, (b.min(), b.max()), (300, 800))
     else:
         rad_m = np.full(len(g), 500.0)
-    polys = [pt.buffer(r) for pt, r in zip(g.geometry, rad_m)]
-    unioned = unary_union(polys)
+    unioned = unary_union(buffer_points(g.geometry.x, g.geometry.y, rad_m))  # geodesic circles
 
-    area_km2 = gpd.GeoSeries([unioned], crs=3857).area.iloc[0] / 1e6
+    area_km2 = to_local(gpd.GeoSeries([unioned], crs=4326)).area.iloc[0] / 1e6
     level = "Very High" if area_km2 > 5 else "High"
-    out = gpd.GeoDataFrame({"HAZ_CLASS":[level]}, geometry=[unioned], crs=3857).to_crs(4326)
+    out = gpd.GeoDataFrame({"HAZ_CLASS":[level]}, geometry=[unioned], crs="EPSG:4326")
     out.to_file(CALFIRE_GPKG, driver="GPKG")
 
 
@@ -189,8 +189,7 @@ def build_quake_from_usgs():
                          crs="EPSG:4326")
     g["PGA_G"] = np.clip(10**(0.5*g["mag"] - 3.2), 0.05, 0.6)
     km = np.clip((g["mag"]-2.5)*8, 5, 40)   # 5–40 km
-    deg = km / 111.0
-    poly = unary_union([pt.buffer(r) for pt,r in zip(g.geometry, deg)])
+    poly = unary_union(buffer_points(g["lon"], g["lat"], km * 1000.0))  # geodesic, not degrees
     gpd.GeoDataFrame({"PGA_G":[float(g["PGA_G"].max())]}, geometry=[poly], crs="EPSG:4326").to_file(USGS_PGA_GPKG, driver="GPKG")
 
 # ----- Open-Meteo heavy-rain proxy -> storm points -----
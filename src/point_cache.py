@@ -0,0 +1,168 @@
+"""Memoized point queries keyed by geohash cell.
+
+Coordinates are snapped to a geohash cell of configurable precision and the
+query is evaluated once at the cell center; every later request that falls in
+the same cell is served from a bounded in-memory LRU, backed by an optional
+SQLite file shared across processes and restarts. Entries are tied to a
+fingerprint of the hazard layers and the model file, so rebuilding either
+invalidates the cache automatically.
+
+Geohash precision 7 is ~150 m cells, 8 is ~38 x 19 m, 9 is ~5 m.
+"""
+import hashlib, json, sqlite3, threading
+from collections import OrderedDict
+
+from .config import MODEL_PKL, POINT_CACHE_DB, POINT_CACHE_PRECISION, POINT_CACHE_SIZE
+from .features import extract_point, layer_fingerprint
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash(lon: float, lat: float, precision: int = POINT_CACHE_PRECISION) -> str:
+    lon_lo, lon_hi, lat_lo, lat_hi = -180.0, 180.0, -90.0, 90.0
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            ch = (ch << 1) | (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            ch = (ch << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+def geohash_center(cell: str):
+    """(lon, lat) of the center of a geohash cell."""
+    lon_lo, lon_hi, lat_lo, lat_hi = -180.0, 180.0, -90.0, 90.0
+    even = True
+    for c in cell:
+        v = _BASE32.index(c)
+        for shift in range(4, -1, -1):
+            bit = (v >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return (lon_lo + lon_hi) / 2, (lat_lo + lat_hi) / 2
+
+def inputs_fingerprint() -> str:
+    """Short hash over layer files and the model file (name, mtime, size)."""
+    st = MODEL_PKL.stat() if MODEL_PKL.exists() else None
+    model = (MODEL_PKL.name, st and st.st_mtime_ns, st and st.st_size)
+    return hashlib.sha1(repr((layer_fingerprint(), model)).encode()).hexdigest()[:16]
+
+class PointCache:
+    def __init__(self, precision: int = POINT_CACHE_PRECISION, maxsize: int = POINT_CACHE_SIZE, db_path=None):
+        self.precision = precision
+        self.maxsize = maxsize
+        self._mem = OrderedDict()  # (kind, cell) -> value, most recent last
+        self._fp = None
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS point_cache (
+                kind TEXT, cell TEXT, fingerprint TEXT, value TEXT,
+                PRIMARY KEY (kind, cell))""")
+            self._db.commit()
+        self.hits_mem = self.hits_db = self.misses = 0
+
+    def _check_fingerprint(self):
+        fp = inputs_fingerprint()
+        if fp != self._fp:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM point_cache WHERE fingerprint != ?", (fp,))
+                self._db.commit()
+            self._fp = fp
+        return fp
+
+    def _remember(self, key, value):
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def get(self, kind: str, lon: float, lat: float, compute):
+        """Value of `compute(lon, lat)` for the snapped cell of (lon, lat), computed at most once.
+
+        `compute` is called with the cell center and must return a JSON-serializable value.
+        """
+        cell = geohash(lon, lat, self.precision)
+        key = (kind, cell)
+        with self._lock:
+            fp = self._check_fingerprint()
+            if key in self._mem:
+                self.hits_mem += 1
+                self._mem.move_to_end(key)
+                return self._mem[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM point_cache WHERE kind = ? AND cell = ? AND fingerprint = ?",
+                    (kind, cell, fp)).fetchone()
+                if row is not None:
+                    self.hits_db += 1
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    return value
+            self.misses += 1
+
+        value = compute(*geohash_center(cell))
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO point_cache VALUES (?, ?, ?, ?)",
+                                 (kind, cell, fp, json.dumps(value)))
+                self._db.commit()
+        return value
+
+    def stats(self) -> dict:
+        total = self.hits_mem + self.hits_db + self.misses
+        return {
+            "hits_mem": self.hits_mem,
+            "hits_db": self.hits_db,
+            "misses": self.misses,
+            "hit_rate": (self.hits_mem + self.hits_db) / total if total else 0.0,
+            "size_mem": len(self._mem),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM point_cache")
+                self._db.commit()
+
+_DEFAULT = None
+
+def default_cache() -> PointCache:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = PointCache(db_path=POINT_CACHE_DB)
+    return _DEFAULT
+
+def _at(feats: dict, lon: float, lat: float) -> dict:
+    # Cached values were computed at the cell center; report the coordinates asked for
+    return {**feats, "lon": lon, "lat": lat}
+
+def cached_extract_point(lon: float, lat: float) -> dict:
+    return _at(default_cache().get("extract", lon, lat, extract_point), lon, lat)
+
+def _predict_json(lon, lat):
+    # predict_point goes through predict.load_model(), which reloads a rebuilt model.pkl
+    from .predict import predict_point
+    feats, label = predict_point(lon, lat)
+    return {"feats": feats, "label": str(label)}
+
+def cached_predict_point(lon: float, lat: float):
+    v = default_cache().get("predict", lon, lat, _predict_json)
+    return _at(v["feats"], lon, lat), v["label"]
@@ -1,13 +1,21 @@
 import pickle
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 
 from src.config import MODEL_PKL
-from src.features import extract_point
+from src.features import extract_point, extract_points
 
-# Load trained model (RandomForest pipeline or DummyClassifier)
-with open(MODEL_PKL, "rb") as f:
-    MODEL = pickle.load(f)
+# Trained model (RandomForest pipeline or DummyClassifier), reloaded when model.pkl changes
+@lru_cache(maxsize=1)
+def _load_model_cached(stamp):
+    with open(MODEL_PKL, "rb") as f:
+        return pickle.load(f)
+
+def load_model():
+    st = MODEL_PKL.stat()
+    return _load_model_cached((st.st_mtime_ns, st.st_size))
 
 COLUMNS = ["fema_zone", "fire_class", "pga_g", "storm_count_5km"]
 
@@ -21,6 +29,24 @@ def _coerce_features_for_model(feat: dict) -> pd.DataFrame:
     }
     return pd.DataFrame([row], columns=COLUMNS)
 
+def _coerce_frame_for_model(feats: pd.DataFrame) -> pd.DataFrame:
+    # Column-wise equivalent of _coerce_features_for_model for many rows
+    def _cat(col):
+        v = feats[col].astype(object)
+        return v.where(v.notna() & (v != ""), "None")
+    return pd.DataFrame({
+        "fema_zone": _cat("fema_zone"),
+        "fire_class": _cat("fire_class"),
+        "pga_g": pd.to_numeric(feats["pga_g"], errors="coerce").fillna(0.0).astype(float),
+        "storm_count_5km": pd.to_numeric(feats["storm_count_5km"], errors="coerce").fillna(0).astype(int),
+    }, columns=COLUMNS)
+
+def predict_frame(feats: pd.DataFrame) -> np.ndarray:
+    """Model labels for a DataFrame of extracted features (one row per point)."""
+    if feats.empty:
+        return np.array([], dtype=object)
+    return np.asarray(load_model().predict(_coerce_frame_for_model(feats)), dtype=object)
+
 def predict_point(lon: float, lat: float):
     # Extract raw geospatial features
     feat = extract_point(lon, lat)
@@ -28,5 +54,10 @@ def predict_point(lon: float, lat: float):
     X = _coerce_features_for_model(feat)
 
     # Some models (DummyClassifier) may not support .predict_proba; label only is fine
-    label = MODEL.predict(X)[0]
+    label = load_model().predict(X)[0]
     return feat, label
+
+def predict_points(lons, lats):
+    """Batch version of `predict_point`: returns (features DataFrame, label array)."""
+    feats = extract_points(lons, lats)
+    return feats, predict_frame(feats)
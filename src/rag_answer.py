@@ -2,24 +2,43 @@ import os
 import json
 import requests
 import numpy as np
-import chromadb
-from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from src.config import RAG_INDEX_DIR  # ABSOLUTE import, not relative
+from src.config import RAG_INDEX_DIR, RAG_BACKEND, RAG_HYBRID, RAG_VECTORS, RAG_CHUNKS  # ABSOLUTE import, not relative
 from typing import Optional
 
 # Embedder (small model; loaded once)
 EMB = SentenceTransformer("all-MiniLM-L6-v2")
 
-def _retrieve(query: str, k: int = 4) -> str:
+def _retrieve_numpy(qemb, query: str, k: int, hazards=None):
+    from src.vector_index import load_index
+    return [doc for _, _, doc in load_index().search(qemb[0], k=k, query=query, hazards=hazards)]
+
+def _retrieve_chroma(qemb, k: int, hazards=None):
+    import chromadb
+    from chromadb.config import Settings
     client = chromadb.PersistentClient(
         path=str(RAG_INDEX_DIR),
         settings=Settings(anonymized_telemetry=False),
     )
     col = client.get_or_create_collection("hazards")
+    where = None
+    if hazards:
+        # indexes built before chunks were tagged have no "hazard" metadata; don't filter those
+        sample = col.get(limit=1, include=["metadatas"]).get("metadatas") or [None]
+        if sample[0] and "hazard" in sample[0]:
+            where = {"hazard": {"$in": list(hazards)}}
+    res = col.query(query_embeddings=qemb.tolist(), n_results=k, where=where)
+    return res.get("documents", [[]])[0]
+
+def _retrieve(query: str, k: int = 4, hazards=None, backend: Optional[str] = None) -> str:
+    """Top-k reference chunks for `query`; a non-empty `hazards` limits them to e.g. {"flood", "fire"}."""
+    backend = backend or RAG_BACKEND
     qemb = EMB.encode([query], convert_to_numpy=True)
-    res = col.query(query_embeddings=qemb.tolist(), n_results=k)
-    docs = res.get("documents", [[]])[0]
+    if backend == "numpy" and RAG_VECTORS.exists() and RAG_CHUNKS.exists():
+        docs = _retrieve_numpy(qemb, query if RAG_HYBRID else None, k, hazards)
+    else:
+        # large corpora, or an index built before the in-process files existed
+        docs = _retrieve_chroma(qemb, k, hazards)
     return "\n\n".join(docs) if docs else ""
 
 def _ollama_generate_http(prompt: str, model: Optional[str] = None, timeout: int = 60) -> str:
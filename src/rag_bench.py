@@ -0,0 +1,58 @@
+"""Retrieval benchmark: in-process NumPy index vs Chroma on the same queries.
+
+    python -m src.rag_build          # writes both indexes
+    python -m src.rag_bench --repeat 50
+
+Query embeddings are computed once up front, since that cost is identical for
+both backends; the timings cover retrieval only, as `_retrieve` performs it.
+"""
+import argparse, time
+import numpy as np
+
+from src.config import RAG_HYBRID
+from src.rag_answer import EMB, _retrieve_numpy, _retrieve_chroma
+
+QUERIES = [
+    "flood=A, fire=None, pga=0.05, storms5km=0",
+    "flood=X, fire=High, pga=0.2, storms5km=3",
+    "flood=None, fire=Very High, pga=0.4, storms5km=6",
+    "What does peak ground acceleration mean for my house?",
+    "How do I prepare for heavy rain and storms?",
+    "Defensible space and ember-resistant vents",
+]
+
+def _time(fn, repeat):
+    ms = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        ms.append((time.perf_counter() - t0) * 1000)
+    return out, np.array(ms)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("-k", type=int, default=4)
+    a = ap.parse_args()
+
+    qembs = [EMB.encode([q], convert_to_numpy=True) for q in QUERIES]
+    _retrieve_numpy(qembs[0], QUERIES[0], a.k)  # warm: map the index file once
+    rows = {"numpy": [], "chroma": []}
+    overlap = []
+    for q, e in zip(QUERIES, qembs):
+        dn, tn = _time(lambda: _retrieve_numpy(e, q if RAG_HYBRID else None, a.k), a.repeat)
+        dc, tc = _time(lambda: _retrieve_chroma(e, a.k), a.repeat)
+        rows["numpy"].append(tn)
+        rows["chroma"].append(tc)
+        dense = _retrieve_numpy(e, None, a.k)  # dense-only ranking is comparable with Chroma's
+        overlap.append(len(set(dense) & set(dc)) / max(1, len(dc)))
+
+    for name, ts in rows.items():
+        t = np.concatenate(ts)
+        print(f"{name:>6}: mean {t.mean():8.3f} ms   p50 {np.percentile(t, 50):8.3f} ms   "
+              f"p95 {np.percentile(t, 95):8.3f} ms")
+    speedup = np.concatenate(rows["chroma"]).mean() / np.concatenate(rows["numpy"]).mean()
+    print(f"speedup: {speedup:.1f}x   dense top-{a.k} overlap with Chroma: {np.mean(overlap):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
-import glob, chromadb
+import glob, json, os, chromadb
+import numpy as np
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from .config import DOCS_DIR, RAG_INDEX_DIR
+from .config import DOCS_DIR, RAG_INDEX_DIR, RAG_VECTORS, RAG_CHUNKS
+
+# Hazard tag per source document, by filename prefix (used for metadata filtering)
+HAZARD_BY_PREFIX = {"fema": "flood", "calfire": "fire", "usgs": "quake", "noaa": "storm"}
 
 def chunks(s, n=800, overlap=120):
     i=0; out=[]
@@ -9,19 +13,39 @@ def chunks(s, n=800, overlap=120):
         out.append(s[i:i+n]); i += (n-overlap)
     return out
 
+def hazard_for(filename):
+    return HAZARD_BY_PREFIX.get(filename.split("_")[0], "general")
+
+def save_vector_index(ids, docs, hazards, embs):
+    """Write normalized embeddings + chunk metadata for src.vector_index."""
+    embs = np.asarray(embs, dtype=np.float32)
+    embs /= np.maximum(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12)
+    # both files are swapped in whole: vector_index memory-maps the live .npy
+    tmp = str(RAG_VECTORS) + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, embs)
+    os.replace(tmp, RAG_VECTORS)
+    tmp = str(RAG_CHUNKS) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "docs": docs, "hazards": hazards}, f)
+    os.replace(tmp, RAG_CHUNKS)
+
 def main():
     RAG_INDEX_DIR.mkdir(parents=True, exist_ok=True)
     client = chromadb.PersistentClient(path=str(RAG_INDEX_DIR), settings=Settings(allow_reset=True))
     col = client.get_or_create_collection("hazards")
     embed = SentenceTransformer("all-MiniLM-L6-v2")
-    ids, docs = [], []
-    for p in glob.glob(str(DOCS_DIR / "*.txt")):
+    ids, docs, hazards = [], [], []
+    for p in sorted(glob.glob(str(DOCS_DIR / "*.txt"))):
         text = open(p, "r", encoding="utf-8", errors="ignore").read()
+        name = os.path.basename(p)
         for j, ch in enumerate(chunks(text)):
-            ids.append(f"{p.split('/')[-1]}_{j}")
+            ids.append(f"{name}_{j}")
             docs.append(ch)
+            hazards.append(hazard_for(name))
     embs = embed.encode(docs, convert_to_numpy=True, show_progress_bar=True)
-    col.add(ids=ids, documents=docs, embeddings=embs.tolist())
+    col.upsert(ids=ids, documents=docs, embeddings=embs.tolist(), metadatas=[{"hazard": h} for h in hazards])
+    save_vector_index(ids, docs, hazards, embs)
     print(f"Indexed {len(docs)} chunks.")
 
 if __name__ == "__main__":
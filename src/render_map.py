@@ -1,9 +1,15 @@
+from functools import lru_cache
+from pathlib import Path
+
 import geopandas as gpd
 import matplotlib.pyplot as plt
-from shapely.geometry import Point
+from matplotlib.colors import ListedColormap
+from shapely.geometry import Point, box
 import contextily as cx
 
-from .config import FEMA_GPKG, CALFIRE_GPKG, USGS_PGA_GPKG, NOAA_STORMS_GP, MAPS_DIR
+from .config import MAPS_DIR
+from .features import load_layers, layer_fingerprint
+from .geodesy import project
 
 COLORS = {
     "flood": "#2c7fb8",
@@ -20,27 +26,48 @@ RISK_COLORS = {
 }
 
 
-def render_map(lon: float, lat: float, risk_label: str, outfile: str):
-    """Render a zoomed-in (~2km) map with OSM basemap, hazards, and legend."""
-    # Load hazard layers
-    fema = gpd.read_file(FEMA_GPKG)
-    cal = gpd.read_file(CALFIRE_GPKG)
-    usgs = gpd.read_file(USGS_PGA_GPKG)
-    storms = gpd.read_file(NOAA_STORMS_GP)
+@lru_cache(maxsize=1)
+def _layers_3857(fingerprint):
+    """Hazard layers in Web Mercator, projected once per layer-file version."""
+    L = load_layers()
+    return tuple(g.to_crs(3857) if not g.empty else g for g in (L.fema, L.cal, L.usgs, L.storms))
+
+
+def _surface_overlay(ax, surface, bounds_m):
+    """Shade the precomputed risk surface (src.risk_surface) under the hazard layers."""
+    import rasterio
+    from rasterio.windows import Window, from_bounds
+    from .risk_rules import LABELS
+
+    ll = gpd.GeoSeries([box(*bounds_m)], crs=3857).to_crs(4326).total_bounds
+    with rasterio.open(surface) as src:
+        win = from_bounds(*ll, transform=src.transform).round_offsets().round_lengths()
+        win = win.intersection(Window(0, 0, src.width, src.height))
+        codes = src.read(1, window=win, masked=True)
+        codes = codes.astype(float).filled(float("nan"))
+        codes[codes < 0] = float("nan")
+        l, b, r, t = src.window_bounds(win)
+    # ~2 km window: treating lon/lat cells as a regular grid in 3857 is visually exact
+    l, b, r, t = gpd.GeoSeries([box(l, b, r, t)], crs=4326).to_crs(3857).total_bounds
+    cmap = ListedColormap([RISK_COLORS[lbl] for lbl in LABELS])
+    ax.imshow(codes, extent=(l, r, b, t), cmap=cmap, vmin=-0.5, vmax=len(LABELS) - 0.5,
+              alpha=0.3, interpolation="nearest", zorder=1.5)
 
-    # Site
-    site = gpd.GeoDataFrame(geometry=[Point(lon, lat)], crs="EPSG:4326")
 
-    # Project to Web Mercator
-    fema_m = fema.to_crs(3857) if not fema.empty else fema
-    cal_m = cal.to_crs(3857) if not cal.empty else cal
-    usgs_m = usgs.to_crs(3857) if not usgs.empty else usgs
-    storms_m = storms.to_crs(3857) if not storms.empty else storms
-    site_m = site.to_crs(3857)
+def render_map(lon: float, lat: float, risk_label: str, outfile: str, surface=None):
+    """Render a zoomed-in (~2km) map with OSM basemap, hazards, and legend.
+
+    If `surface` points to an existing risk-surface GeoTIFF, its cell labels are
+    shaded underneath the hazard overlays.
+    """
+    # Hazard layers, already projected to Web Mercator
+    fema_m, cal_m, usgs_m, storms_m = _layers_3857(layer_fingerprint())
+
+    # Site
+    sx, sy = (float(v) for v in project(lon, lat, dst=3857))
+    site_m = gpd.GeoDataFrame(geometry=[Point(sx, sy)], crs="EPSG:3857")
 
     # 2 km zoom window
-    sx = site_m.geometry.x.iloc[0]
-    sy = site_m.geometry.y.iloc[0]
     pad = 2000
     minx, miny, maxx, maxy = sx - pad, sy - pad, sx + pad, sy + pad
 
@@ -57,6 +84,14 @@ def render_map(lon: float, lat: float, risk_label: str, outfile: str):
     except Exception:
         ax.set_facecolor("white")
 
+    if surface is not None and Path(surface).exists():
+        try:
+            _surface_overlay(ax, surface, (minx, miny, maxx, maxy))
+            ax.set_xlim(minx, maxx)
+            ax.set_ylim(miny, maxy)
+        except Exception:
+            pass
+
     # ----- Hazard overlays -----
     if not fema_m.empty:
         fema_m.boundary.plot(ax=ax, color=COLORS["flood"], linewidth=0.8, alpha=0.9, zorder=3)
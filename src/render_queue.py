@@ -0,0 +1,78 @@
+"""Background map rendering: a bounded, de-duplicated process pool around `render_map`.
+
+Rendering (basemap fetch + high-dpi savefig) is much slower than scoring a site,
+so the app submits it here and shows the PNG once the future completes. Each
+worker process holds at most one matplotlib figure, and at most `max_pending`
+renders are queued or running at once.
+"""
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .render_map import render_map
+
+def _render_atomic(lon, lat, label, outfile, surface=None):
+    # Write next to the target and rename, so readers never see a half-written PNG
+    tmp = f"{outfile}.tmp.png"
+    try:
+        render_map(lon, lat, label, tmp, surface=surface)
+        os.replace(tmp, outfile)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return outfile
+
+class RenderQueue:
+    def __init__(self, workers: int = 2, max_pending: int = 8):
+        self._workers = workers
+        self._pool = self._new_pool()
+        self._pending = {}  # outfile -> Future, while queued or running
+        self._lock = threading.Lock()
+        self.max_pending = max_pending
+
+    def _new_pool(self):
+        # spawn: forking a threaded server process (Streamlit) is unsafe
+        return ProcessPoolExecutor(max_workers=self._workers, mp_context=mp.get_context("spawn"))
+
+    def submit(self, lon: float, lat: float, label: str, outfile: str, surface=None):
+        """Queue a render of `outfile`; returns its Future, or None if the queue is full.
+
+        A render already in flight for the same output file is shared, not repeated.
+        If a worker died and broke the pool, the pool is rebuilt and the submit retried once.
+        """
+        key = str(outfile)
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is not None:
+                return fut
+            if len(self._pending) >= self.max_pending:
+                return None
+            args = (_render_atomic, lon, lat, label, key, None if surface is None else str(surface))
+            try:
+                fut = self._pool.submit(*args)
+            except BrokenProcessPool:
+                # futures of the broken pool have already failed; start over with fresh workers
+                self._pool.shutdown(wait=False)
+                self._pool = self._new_pool()
+                self._pending.clear()
+                try:
+                    fut = self._pool.submit(*args)
+                except BrokenProcessPool:
+                    return None
+            self._pending[key] = fut
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return fut
+
+    def _forget(self, key, fut):
+        with self._lock:
+            if self._pending.get(key) is fut:
+                del self._pending[key]
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,3 +1,9 @@
+import numpy as np
+import pandas as pd
+
+LABELS = np.array(["Low", "Moderate", "High", "Very High"], dtype=object)
+LABEL_EDGES = [25, 45, 65]
+
 def _score_flood(zone):
     if not zone: return 0
     z = str(zone).upper()
@@ -35,3 +41,45 @@ def label_from_score(s: int) -> str:
     if s < 45: return "Moderate"
     if s < 65: return "High"
     return "Very High"
+
+# ----- Array-native versions (identical results to the scalar rules above) -----
+
+def _categorical_scores(values, scorer) -> np.ndarray:
+    """Score each distinct category once, then broadcast through the codes."""
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        codes, uniques = np.asarray(values.cat.codes), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=True)
+    lut = np.array([scorer(u) for u in uniques] + [0], dtype=np.int64)
+    return lut[codes]  # code -1 (missing) picks the trailing 0
+
+def _column(cols, name, n, fill=None):
+    if name in cols:
+        return cols[name]
+    return np.full(n, fill, dtype=object)
+
+def _numeric(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind in "biuf":
+        return arr.astype(float, copy=False)
+    return pd.to_numeric(pd.Series(arr, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+def _score_quake_batch(p) -> np.ndarray:
+    p = _numeric(p)
+    return np.select([p >= 0.35, p >= 0.20], [25, 15], 0)
+
+def _score_storm_batch(n) -> np.ndarray:
+    n = np.nan_to_num(_numeric(n), nan=0.0)
+    return np.array([0, 5, 10], dtype=np.int64)[np.digitize(n, [2, 5])]
+
+def rule_score_batch(cols) -> np.ndarray:
+    """Vectorized `rule_score` over a DataFrame or a mapping of equal-length columns."""
+    n = len(cols) if isinstance(cols, pd.DataFrame) else len(next(iter(cols.values()), []))
+    return (_categorical_scores(_column(cols, "fema_zone", n), _score_flood) +
+            _categorical_scores(_column(cols, "fire_class", n), _score_fire) +
+            _score_quake_batch(_column(cols, "pga_g", n)) +
+            _score_storm_batch(_column(cols, "storm_count_5km", n, 0)))
+
+def label_from_score_batch(s) -> np.ndarray:
+    """Vectorized `label_from_score`; returns an object array of label strings."""
+    return LABELS[np.digitize(np.asarray(s, dtype=float), LABEL_EDGES)]
@@ -0,0 +1,223 @@
+"""Whole-region risk surface: features, rule score and model label for every grid cell.
+
+    python -m src.risk_surface --res 0.001 --workers 4
+
+The bbox is cut into square tiles that are computed in a process pool and
+checkpointed as .npz chunks in `<out>.tiles/`, so an interrupted run resumes
+from the tiles already on disk. Finished chunks are assembled into a tiled
+GeoTIFF that `render_map` can overlay and `lookup` can sample per point.
+
+With --rules-only the label band holds the rule-based label and no model is
+needed; the chunks then double as a feature dump for `train_ml --stream`.
+"""
+import argparse, json, math, os, shutil
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from tqdm import tqdm
+
+from .config import (
+    DAVIS_BBOX, FEMA_GPKG, CALFIRE_GPKG, USGS_PGA_GPKG, NOAA_STORMS_GP,
+    MODEL_PKL, RISK_SURFACE_TIF, TARGET_CRS
+)
+from .schema_map import SCHEMA
+from .features import extract_points
+from .risk_rules import LABELS, rule_score_batch, label_from_score_batch
+
+BANDS = ["risk_label", "rule_score", "fema_zone", "fire_class", "pga_g", "storm_count_5km"]
+NODATA = -9999.0          # cell not computed; categorical bands use -1 for "no zone/class"
+BYTES_PER_CELL = 2048     # rough peak per cell while joining/predicting a tile
+MAX_TASKS_PER_CHILD = 32  # recycle workers to hand fragmented memory back to the OS
+
+def tile_for_memory(mem_mb: int) -> int:
+    """Largest tile edge (multiple of 16, as GeoTIFF blocks require) fitting in `mem_mb`."""
+    edge = int(math.sqrt(mem_mb * 2**20 / BYTES_PER_CELL))
+    return max(16, edge - edge % 16)
+
+def grid_shape(bbox, res):
+    minx, miny, maxx, maxy = bbox
+    # round away float noise (0.1 / 0.002 = 50.00000000000001) so it can't add a row/column
+    cells = lambda span: math.ceil(round(span / res, 9))
+    return cells(maxy - miny), cells(maxx - minx)
+
+def iter_tiles(height, width, tile):
+    for r in range(0, height, tile):
+        for c in range(0, width, tile):
+            yield r, c, min(tile, height - r), min(tile, width - c)
+
+def _vocab(path, col):
+    """Sorted distinct values of a categorical layer column ([] if unreadable)."""
+    try:
+        v = gpd.read_file(path, ignore_geometry=True)[col].dropna()
+        return sorted({str(x) for x in v})
+    except Exception:
+        return []
+
+def _inputs(rules_only=False):
+    """Modification times of everything a tile depends on; resumes must match."""
+    paths = [FEMA_GPKG, CALFIRE_GPKG, USGS_PGA_GPKG, NOAA_STORMS_GP]
+    if not rules_only:
+        # rules-only chunks feed train_ml --stream, which rewrites the model itself
+        paths.append(MODEL_PKL)
+    return {p.name: (p.stat().st_mtime_ns if p.exists() else None) for p in paths}
+
+def _chunk_path(tiles_dir, r, c):
+    return Path(tiles_dir) / f"{r}_{c}.npz"
+
+# ----- worker side -----
+_JOB = None
+
+def _init_worker(job):
+    global _JOB
+    _JOB = job
+
+def _compute_tile(tile):
+    r, c, h, w = tile
+    minx, _, _, maxy = _JOB["bbox"]
+    res = _JOB["res"]
+    xs = minx + (np.arange(c, c + w) + 0.5) * res
+    ys = maxy - (np.arange(r, r + h) + 0.5) * res
+    lon, lat = np.meshgrid(xs, ys)
+
+    feats = extract_points(lon.ravel(), lat.ravel())
+    score = rule_score_batch(feats)
+    if _JOB["rules_only"]:
+        labels = label_from_score_batch(score)
+    else:
+        from .predict import predict_frame  # model is loaded once per worker process
+        labels = predict_frame(feats)
+
+    cats = _JOB["categories"]
+    out = np.stack([
+        pd.Categorical(labels, categories=LABELS).codes,
+        score,
+        pd.Categorical(feats["fema_zone"], categories=cats["fema_zone"]).codes,
+        pd.Categorical(feats["fire_class"], categories=cats["fire_class"]).codes,
+        feats["pga_g"].to_numpy(dtype=float),
+        feats["storm_count_5km"].to_numpy(),
+    ]).astype(np.float32).reshape(len(BANDS), h, w)
+
+    path = _chunk_path(_JOB["tiles_dir"], r, c)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(tmp, data=out)
+    os.replace(tmp, path)  # atomic: a chunk on disk is always complete
+    return tile
+
+# ----- driver -----
+def _prepare(bbox, res, tile, tiles_dir, restart, rules_only=False):
+    height, width = grid_shape(bbox, res)
+    job = {
+        "bbox": list(bbox), "res": res, "tile": tile,
+        "height": height, "width": width, "bands": BANDS, "rules_only": rules_only,
+        "categories": {
+            "fema_zone": _vocab(FEMA_GPKG, SCHEMA["fema"]["zone_col"]),
+            "fire_class": _vocab(CALFIRE_GPKG, SCHEMA["calfire"]["hazard_col"]),
+        },
+        "inputs": _inputs(rules_only),
+        "tiles_dir": str(tiles_dir),
+    }
+    manifest = Path(tiles_dir) / "manifest.json"
+    if restart and Path(tiles_dir).exists():
+        shutil.rmtree(tiles_dir)
+    if manifest.exists():
+        prev = json.loads(manifest.read_text())
+        if prev != job:
+            raise SystemExit(f"{tiles_dir} holds chunks for a different grid, layers or model; "
+                             "rerun with --restart to discard them.")
+    Path(tiles_dir).mkdir(parents=True, exist_ok=True)
+    manifest.write_text(json.dumps(job, indent=2))
+    return job
+
+def _assemble(job, outfile):
+    minx, _, _, maxy = job["bbox"]
+    block = job["tile"]
+    profile = dict(
+        driver="GTiff", width=job["width"], height=job["height"], count=len(BANDS),
+        dtype="float32", crs=TARGET_CRS, nodata=NODATA,
+        transform=from_origin(minx, maxy, job["res"], job["res"]),
+        tiled=True, blockxsize=block, blockysize=block, compress="deflate",
+    )
+    Path(outfile).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{outfile}.tmp.tif"
+    with rasterio.open(tmp, "w", **profile) as dst:
+        for i, name in enumerate(BANDS, start=1):
+            dst.set_band_description(i, name)
+        dst.update_tags(categories=json.dumps(job["categories"]), labels=json.dumps(list(LABELS)))
+        for r, c, h, w in iter_tiles(job["height"], job["width"], job["tile"]):
+            with np.load(_chunk_path(job["tiles_dir"], r, c)) as z:
+                dst.write(z["data"], window=Window(c, r, w, h))
+    os.replace(tmp, outfile)  # render workers may read the surface at any time
+
+def tiles_dir_for(outfile) -> Path:
+    return Path(str(outfile) + ".tiles")
+
+def build_surface(bbox=DAVIS_BBOX, res=0.001, workers=None, mem_mb=512,
+                  outfile=RISK_SURFACE_TIF, restart=False, rules_only=False):
+    """Compute every cell of a `res`-degree grid over `bbox` and write `outfile`."""
+    tiles_dir = tiles_dir_for(outfile)
+    job = _prepare(bbox, res, tile_for_memory(mem_mb), tiles_dir, restart, rules_only)
+    all_tiles = list(iter_tiles(job["height"], job["width"], job["tile"]))
+    todo = [t for t in all_tiles if not _chunk_path(tiles_dir, t[0], t[1]).exists()]
+    print(f"Grid {job['height']}x{job['width']} in {len(all_tiles)} tiles of {job['tile']}px; "
+          f"{len(all_tiles) - len(todo)} already done.")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(job)
+        for t in tqdm(todo):
+            _compute_tile(t)
+    elif todo:
+        with Pool(workers, initializer=_init_worker, initargs=(job,),
+                  maxtasksperchild=MAX_TASKS_PER_CHILD) as pool:
+            for _ in tqdm(pool.imap_unordered(_compute_tile, todo), total=len(todo)):
+                pass
+
+    _assemble(job, outfile)
+    print("Saved risk surface to", outfile)
+
+def lookup(lon: float, lat: float, path=RISK_SURFACE_TIF):
+    """Features, rule score and label of the surface cell containing (lon, lat), or None."""
+    if not Path(path).exists():
+        return None
+    with rasterio.open(path) as src:
+        b = src.bounds
+        if not (b.left <= lon < b.right and b.bottom < lat <= b.top):
+            return None
+        r, c = src.index(lon, lat)
+        v = src.read(window=Window(c, r, 1, 1))[:, 0, 0]
+        cats = json.loads(src.tags()["categories"])
+    if v[0] == NODATA:
+        return None
+    cat = lambda codes, i: None if i < 0 else codes[int(i)]
+    return {
+        "lon": lon,
+        "lat": lat,
+        "fema_zone": cat(cats["fema_zone"], v[2]),
+        "fire_class": cat(cats["fire_class"], v[3]),
+        "pga_g": None if np.isnan(v[4]) else float(v[4]),
+        "storm_count_5km": int(v[5]),
+        "rule_score": int(v[1]),
+        "risk_label": cat(LABELS, v[0]),
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--bbox", type=float, nargs=4, default=DAVIS_BBOX,
+                    metavar=("MINX", "MINY", "MAXX", "MAXY"))
+    ap.add_argument("--res", type=float, default=0.001, help="cell size in degrees")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--mem-mb", type=int, default=512, help="approx. memory budget per worker")
+    ap.add_argument("--out", default=str(RISK_SURFACE_TIF))
+    ap.add_argument("--restart", action="store_true", help="discard chunks from a previous run")
+    ap.add_argument("--rules-only", action="store_true", help="label with risk_rules, skip the model")
+    a = ap.parse_args()
+    build_surface(tuple(a.bbox), a.res, a.workers, a.mem_mb, a.out, a.restart, a.rules_only)
+
+if __name__ == "__main__":
+    main()
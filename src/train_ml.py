@@ -1,16 +1,18 @@
-import pickle, numpy as np, pandas as pd
+import argparse, json, pickle, sys, time, numpy as np, pandas as pd
 from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.dummy import DummyClassifier
 from sklearn.utils import resample
+from sklearn.utils.class_weight import compute_sample_weight
 
-from .config import DAVIS_BBOX, MODEL_PKL, MODELS_DIR
+from .config import DAVIS_BBOX, MODEL_PKL, MODELS_DIR, RISK_SURFACE_TIF
 from .features import extract_point
-from .risk_rules import rule_score, label_from_score
+from .risk_rules import LABELS, LABEL_EDGES, rule_score_batch, label_from_score_batch
+from .risk_surface import BANDS, NODATA, tiles_dir_for
 
 MIN_PER_CLASS = 6  # upsample target per class to avoid stratify failures
 
@@ -22,14 +24,10 @@ def sample_grid(bbox, nx=14, ny=14):
     return [(float(lon), float(lat)) for lon in lons for lat in lats]
 
 def build_dataset(bbox):
-    rows=[]
-    for lon,lat in sample_grid(bbox):
-        f = extract_point(lon, lat)
-        s = rule_score(f)
-        f["rule_score"] = s
-        f["risk_label"] = label_from_score(s)
-        rows.append(f)
+    rows = [extract_point(lon, lat) for lon,lat in sample_grid(bbox)]
     df = pd.DataFrame(rows)
+    df["rule_score"] = rule_score_batch(df)
+    df["risk_label"] = label_from_score_batch(df["rule_score"])
     # Drop rows with all-None critical features (very rare)
     if {"fema_zone","fire_class","pga_g","storm_count_5km"}.issubset(df.columns):
         if df[["fema_zone","fire_class","pga_g","storm_count_5km"]].isna().all(axis=1).any():
@@ -94,7 +92,191 @@ def train(df):
         pickle.dump(pipe, f)
     print("Saved model to", MODEL_PKL)
 
+# ----- Out-of-core training from risk_surface chunks -----
+FEATURES = ["fema_zone","fire_class","pga_g","storm_count_5km"]
+PER_CLASS = 200_000  # reservoir size per label; bounds training memory
+
+def iter_feature_chunks(tiles_dir):
+    """Yield (codes, pga, storms, label) arrays per chunk written by src.risk_surface.
+
+    Categorical columns stay as integer codes into the manifest vocabularies; the
+    target is the rule-based label recomputed from the stored rule score.
+    """
+    for path in sorted(Path(tiles_dir).glob("*_*.npz")):
+        if path.name.endswith(".tmp.npz"):
+            continue
+        with np.load(path) as z:
+            d = z["data"].reshape(len(BANDS), -1)
+        ok = d[BANDS.index("rule_score")] != NODATA
+        d = d[:, ok]
+        yield (d[BANDS.index("fema_zone")].astype(np.int16),
+               d[BANDS.index("fire_class")].astype(np.int16),
+               d[BANDS.index("pga_g")],
+               d[BANDS.index("storm_count_5km")],
+               np.digitize(d[BANDS.index("rule_score")], LABEL_EDGES).astype(np.int8))
+
+def stratified_reservoir(chunks, per_class=PER_CLASS, random_state=42):
+    """Uniform sample of up to `per_class` rows of every label from a stream of chunks.
+
+    Classic reservoir sampling run separately per class, so rare labels are kept
+    whole and common ones are subsampled without ever holding the full stream.
+    Returns (rows float32 [n, 4], label codes [n], rows seen per class).
+    """
+    rng = np.random.RandomState(random_state)
+    res, seen = {}, {}
+    for fz, fc, pga, storms, y in chunks:
+        X = np.column_stack([fz, fc, pga, storms]).astype(np.float32)
+        for cls in np.unique(y):
+            rows = X[y == cls]
+            buf = res.setdefault(cls, np.empty((0, X.shape[1]), dtype=np.float32))
+            n0 = seen.get(cls, 0)
+            room = max(0, per_class - len(buf))
+            if room:
+                buf = np.vstack([buf, rows[:room]])
+            rest = rows[room:]
+            if len(rest):
+                # row k of the stream (0-based) replaces slot j ~ U[0, k] when j < per_class
+                k = n0 + room + np.arange(len(rest))
+                j = (rng.random_sample(len(rest)) * (k + 1)).astype(np.int64)
+                keep = j < per_class
+                buf[j[keep]] = rest[keep]
+            res[cls] = buf
+            seen[cls] = n0 + len(rows)
+    if not res:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.int8), {}
+    classes = sorted(res)
+    X = np.vstack([res[c] for c in classes])
+    y = np.concatenate([np.full(len(res[c]), c, dtype=np.int8) for c in classes])
+    return X, y, {LABELS[c]: seen[c] for c in classes}
+
+def _decode(X, categories):
+    """Reservoir rows back to the DataFrame layout the model pipeline expects."""
+    def cat(codes, vocab):
+        v = np.asarray(vocab + ["None"], dtype=object)  # code -1 -> "None", as in predict.py
+        return v[codes.astype(np.int64)]
+    return pd.DataFrame({
+        "fema_zone": cat(X[:, 0], categories["fema_zone"]),
+        "fire_class": cat(X[:, 1], categories["fire_class"]),
+        "pga_g": np.nan_to_num(X[:, 2].astype(float), nan=0.0),
+        "storm_count_5km": X[:, 3].astype(int),
+    }, columns=FEATURES)
+
+ESTIMATORS = {"forest": RandomForestClassifier, "hgb": HistGradientBoostingClassifier}
+
+def _min_leaf(y, default=20):
+    # With balanced weights the rarest class needs room for its own leaves; at the
+    # default of 20 a class with fewer rows is absorbed and its weight drags the
+    # shared leaf's prediction over
+    return max(1, min(default, int(pd.Series(y).value_counts().min()) // 2))
+
+def _make_pipeline(kind, n_jobs, min_leaf=20):
+    if kind == "hgb":
+        # histogram boosting: memory bounded by bins, not by rows
+        pre = ColumnTransformer([
+            ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), ["fema_zone","fire_class"]),
+            ("num", "passthrough", ["pga_g","storm_count_5km"]),
+        ])
+        clf = HistGradientBoostingClassifier(max_iter=200, early_stopping=False,
+                                             min_samples_leaf=min_leaf, random_state=42)
+    else:
+        pre = ColumnTransformer([
+            ("cat", OneHotEncoder(handle_unknown="ignore"), ["fema_zone","fire_class"]),
+            ("num", "passthrough", ["pga_g","storm_count_5km"]),
+        ])
+        clf = RandomForestClassifier(n_estimators=220, n_jobs=n_jobs, random_state=42)
+    return Pipeline([("pre", pre), ("clf", clf)])
+
+def _warm_start(pipe_prev, kind, classes, more, n_jobs=-1, min_leaf=20):
+    """Grow the previous model's ensemble instead of starting over, if compatible.
+
+    Returns (pipeline or None, reason it could not be warm-started).
+    """
+    clf = pipe_prev.named_steps["clf"] if isinstance(pipe_prev, Pipeline) else None
+    if type(clf) is not ESTIMATORS[kind]:
+        return None, f"it holds a {type(clf if clf is not None else pipe_prev).__name__}, not --model {kind}"
+    if set(getattr(clf, "classes_", [])) != set(classes):
+        return None, f"its classes {list(clf.classes_)} differ from the sampled ones"
+    if kind == "forest":
+        clf.set_params(warm_start=True, n_estimators=clf.n_estimators + more, n_jobs=n_jobs)
+    else:
+        clf.set_params(warm_start=True, max_iter=clf.max_iter + more, min_samples_leaf=min_leaf)
+    return pipe_prev, None
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where `resource` is unavailable."""
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KB on Linux
+
+def train_stream(tiles_dir, kind="forest", per_class=PER_CLASS, n_jobs=-1, warm_start=False, more=50):
+    """Train from risk_surface chunks without materializing the full grid.
+
+    Rows are drawn by per-class reservoir sampling and classes are balanced with
+    sample weights rather than upsampled copies.
+    """
+    manifest = json.loads((Path(tiles_dir) / "manifest.json").read_text())
+    t0 = time.perf_counter()
+    Xr, yr, seen = stratified_reservoir(iter_feature_chunks(tiles_dir), per_class)
+    print(f"Sampled {len(yr)} rows in {time.perf_counter() - t0:.1f}s from {sum(seen.values())} cells; "
+          f"per-class seen: {seen}")
+    if len(yr) == 0:
+        print("No computed cells found in", tiles_dir)
+        return
+    X = _decode(Xr, manifest["categories"])
+    y = LABELS[yr]
+    if len(np.unique(y)) == 1:
+        return train(X.assign(risk_label=y))  # same DummyClassifier fallback as the small path
+
+    try:
+        Xtr, Xte, ytr, yte = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+    except ValueError as e:
+        print("Stratified split failed, falling back to non-stratified:", e)
+        Xtr, Xte, ytr, yte = train_test_split(X, y, test_size=0.2, random_state=42)
+    w = compute_sample_weight("balanced", ytr)
+    min_leaf = _min_leaf(ytr)
+
+    pipe = None
+    if warm_start and MODEL_PKL.exists():
+        with open(MODEL_PKL, "rb") as f:
+            pipe, why = _warm_start(pickle.load(f), kind, np.unique(ytr), more, n_jobs, min_leaf)
+        if pipe is None:
+            print(f"Cannot warm-start {MODEL_PKL}: {why}; training from scratch.")
+
+    t0 = time.perf_counter()
+    if pipe is not None:
+        # keep the fitted encoder so existing trees/iterations see the same columns
+        pipe.named_steps["clf"].fit(pipe.named_steps["pre"].transform(Xtr), ytr, sample_weight=w)
+    else:
+        pipe = _make_pipeline(kind, n_jobs, min_leaf)
+        pipe.fit(Xtr, ytr, clf__sample_weight=w)
+    fit_s = time.perf_counter() - t0
+
+    acc = pipe.score(Xte, yte)
+    print(f"Validation accuracy: {acc:.3f} on {len(yte)} samples (training size={len(Xtr)})")
+    rss = _peak_rss_mb()
+    print(f"Fit time: {fit_s:.1f}s, peak RSS: {'n/a' if rss is None else f'{rss:.0f} MB'}, "
+          f"sample: {Xr.nbytes / 2**20:.1f} MB")
+
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(MODEL_PKL, "wb") as f:
+        pickle.dump(pipe, f)
+    print("Saved model to", MODEL_PKL)
+
 if __name__ == "__main__":
-    df = build_dataset(DAVIS_BBOX)
-    print("Label distribution before balancing:\n", df["risk_label"].value_counts())
-    train(df)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stream", nargs="?", const=str(tiles_dir_for(RISK_SURFACE_TIF)), default=None,
+                    help="train from risk_surface chunks (default: the risk surface tile dir)")
+    ap.add_argument("--model", choices=["forest", "hgb"], default="forest")
+    ap.add_argument("--per-class", type=int, default=PER_CLASS)
+    ap.add_argument("--n-jobs", type=int, default=-1)
+    ap.add_argument("--warm-start", action="store_true", help="grow the existing model.pkl")
+    a = ap.parse_args()
+    if a.stream:
+        train_stream(a.stream, a.model, a.per_class, a.n_jobs, a.warm_start)
+    else:
+        df = build_dataset(DAVIS_BBOX)
+        print("Label distribution before balancing:\n", df["risk_label"].value_counts())
+        train(df)
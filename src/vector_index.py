@@ -0,0 +1,71 @@
+"""In-process retrieval over the hazard notes: exact dense top-k plus optional BM25.
+
+`rag_build` writes L2-normalized chunk embeddings to RAG_VECTORS (float32 .npy)
+and chunk text/metadata to RAG_CHUNKS. Here the matrix is memory-mapped, so a
+query is one dot product against a few rows with no client or HNSW overhead.
+"""
+import json, math, re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from .config import RAG_VECTORS, RAG_CHUNKS
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str):
+    return _TOKEN.findall(text.lower())
+
+class VectorIndex:
+    def __init__(self, vectors_path=RAG_VECTORS, chunks_path=RAG_CHUNKS, k1: float = 1.5, b: float = 0.75):
+        self.vectors = np.load(vectors_path, mmap_mode="r")
+        meta = json.loads(open(chunks_path, "r", encoding="utf-8").read())
+        self.ids, self.docs, self.hazards = meta["ids"], meta["docs"], np.asarray(meta["hazards"])
+        if len(self.vectors) != len(self.ids):
+            raise ValueError(f"{vectors_path} has {len(self.vectors)} rows but {chunks_path} lists "
+                             f"{len(self.ids)} chunks; rerun python -m src.rag_build")
+        # BM25 statistics; the corpus is a handful of chunks, so plain Counters are enough
+        self._tf = [Counter(tokenize(d)) for d in self.docs]
+        self._len = np.array([sum(tf.values()) for tf in self._tf], dtype=float)
+        self._df = Counter(t for tf in self._tf for t in tf)
+        self._k1, self._b = k1, b
+
+    def bm25(self, query: str) -> np.ndarray:
+        n, avgdl = len(self.docs), (self._len.mean() if len(self.docs) else 0.0)
+        scores = np.zeros(n)
+        for term in set(tokenize(query)):
+            df = self._df.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            tf = np.array([d.get(term, 0) for d in self._tf], dtype=float)
+            scores += idf * tf * (self._k1 + 1) / (tf + self._k1 * (1 - self._b + self._b * self._len / avgdl))
+        return scores
+
+    def search(self, qvec, k: int = 4, query: str = None, hazards=None, alpha: float = 0.7):
+        """Top-k (score, id, doc) by cosine similarity, optionally blended with BM25.
+
+        `qvec` is the query embedding; with `query` text the score is
+        alpha * cosine + (1 - alpha) * BM25 scaled to [0, 1]. A non-empty
+        `hazards` restricts results to chunks tagged with those hazard types.
+        """
+        q = np.asarray(qvec, dtype=np.float32).ravel()
+        q = q / (np.linalg.norm(q) or 1.0)
+        score = np.asarray(self.vectors @ q, dtype=float)
+        if query:
+            kw = self.bm25(query)
+            top = kw.max()
+            score = alpha * score + (1 - alpha) * (kw / top if top > 0 else kw)
+        if hazards:
+            score = np.where(np.isin(self.hazards, list(hazards)), score, -np.inf)
+        order = np.argsort(-score, kind="stable")[:k]
+        return [(float(score[i]), self.ids[i], self.docs[i]) for i in order if np.isfinite(score[i])]
+
+@lru_cache(maxsize=1)
+def _cached(vectors_mtime, chunks_mtime):
+    return VectorIndex()
+
+def load_index() -> VectorIndex:
+    """Shared index, reloaded when rag_build rewrites the files."""
+    return _cached(RAG_VECTORS.stat().st_mtime_ns, RAG_CHUNKS.stat().st_mtime_ns)
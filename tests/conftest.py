@@ -0,0 +1,5 @@
+# Make `src` importable when running plain `pytest` from the project root
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
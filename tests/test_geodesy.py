@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from src.geodesy import (
+    GEOD, HAVERSINE_REL_ERR, buffer_points, count_within, geodesic_m, haversine_m,
+)
+
+
+@pytest.fixture
+def pairs():
+    """Random point pairs with known WGS84 geodesic separation (10 m - 50 km)."""
+    rng = np.random.default_rng(0)
+    n = 20_000
+    lon1 = rng.uniform(-180, 180, n)
+    lat1 = rng.uniform(-80, 80, n)
+    az = rng.uniform(0, 360, n)
+    dist = rng.uniform(10, 50_000, n)
+    lon2, lat2, _ = GEOD.fwd(lon1, lat1, az, dist)
+    return lon1, lat1, np.asarray(lon2), np.asarray(lat2), dist
+
+
+def test_haversine_within_sphere_error_bound(pairs):
+    lon1, lat1, lon2, lat2, dist = pairs
+    rel = np.abs(haversine_m(lon1, lat1, lon2, lat2) - dist) / dist
+    assert rel.max() <= HAVERSINE_REL_ERR
+
+
+def test_geodesic_matches_ground_truth(pairs):
+    lon1, lat1, lon2, lat2, dist = pairs
+    np.testing.assert_allclose(geodesic_m(lon1, lat1, lon2, lat2), dist, rtol=0, atol=1e-6)
+
+
+def test_count_within_splits_ring_exactly():
+    # targets exactly 1 m inside / outside 5 km must be split exactly
+    n = 10_000
+    az = np.random.default_rng(1).uniform(0, 360, n)
+    ring = np.r_[np.full(n // 2, 4999.0), np.full(n - n // 2, 5001.0)]
+    plon, plat, _ = GEOD.fwd(np.full(n, 10.0), np.full(n, 60.0), az, ring)
+    assert count_within([10.0], [60.0], plon, plat, 5000.0)[0] == n // 2
+
+
+def test_count_within_matches_brute_force_geodesic():
+    rng = np.random.default_rng(2)
+    lons, lats = rng.uniform(-118.9, -117.7, 2_000), rng.uniform(33.6, 34.5, 2_000)
+    plons, plats = rng.uniform(-118.9, -117.7, 40), rng.uniform(33.6, 34.5, 40)
+    d = geodesic_m(lons[:, None], lats[:, None], plons[None, :], plats[None, :])
+    expected = (d <= 5000.0).sum(axis=1)
+    # small chunk forces several distance blocks
+    np.testing.assert_array_equal(count_within(lons, lats, plons, plats, 5000.0, chunk=1_000), expected)
+
+
+def test_count_within_empty_targets():
+    assert count_within([0.0, 1.0], [0.0, 1.0], [], [], 5000.0).tolist() == [0, 0]
+
+
+def test_buffer_vertices_on_geodesic_radius():
+    circle = buffer_points([-118.25], [34.05], [20_000.0])[0]
+    bx, by = np.asarray(circle.exterior.coords).T
+    assert np.abs(geodesic_m(-118.25, 34.05, bx, by) - 20_000.0).max() < 1e-3
@@ -0,0 +1,59 @@
+import os, pickle
+
+import numpy as np
+import pytest
+from sklearn.dummy import DummyClassifier
+
+import src.point_cache as pc
+import src.predict as predict
+
+FEATS = {"lon": 0.0, "lat": 0.0, "fema_zone": "A", "fire_class": None, "pga_g": None, "storm_count_5km": 0}
+
+
+def _write_model(path, label, mtime_s):
+    clf = DummyClassifier(strategy="constant", constant=label)
+    clf.fit(np.zeros((4, 1)), ["Low", "Moderate", "High", "Very High"])
+    with open(path, "wb") as f:
+        pickle.dump(clf, f)
+    os.utime(path, (mtime_s, mtime_s))  # explicit mtimes: filesystems may have coarse clocks
+
+
+@pytest.fixture
+def model_pkl(tmp_path, monkeypatch):
+    path = tmp_path / "model.pkl"
+    monkeypatch.setattr(predict, "MODEL_PKL", path)
+    monkeypatch.setattr(pc, "MODEL_PKL", path)
+    monkeypatch.setattr(predict, "extract_point", lambda lon, lat: {**FEATS, "lon": lon, "lat": lat})
+    monkeypatch.setattr(pc, "layer_fingerprint", lambda: ())
+    predict._load_model_cached.cache_clear()
+    return path
+
+
+def test_geohash_roundtrip():
+    assert pc.geohash(10.40744, 57.64911, 11) == "u4pruydqqvj"
+    cell = pc.geohash(-118.25, 34.05, 9)
+    assert pc.geohash(*pc.geohash_center(cell), 9) == cell
+
+
+def test_snapped_points_share_an_entry(model_pkl, tmp_path, monkeypatch):
+    _write_model(model_pkl, "Low", 1_000_000)
+    monkeypatch.setattr(pc, "_DEFAULT", pc.PointCache(db_path=tmp_path / "c.sqlite"))
+    feats, label = pc.cached_predict_point(-118.25, 34.05)
+    feats2, _ = pc.cached_predict_point(-118.25001, 34.05001)
+    assert label == "Low" and feats2["lon"] == -118.25001
+    assert pc.default_cache().stats()["misses"] == 1
+
+
+def test_rebuilt_model_changes_cached_label(model_pkl, tmp_path, monkeypatch):
+    db = tmp_path / "c.sqlite"
+    _write_model(model_pkl, "Low", 1_000_000)
+    monkeypatch.setattr(pc, "_DEFAULT", pc.PointCache(db_path=db))
+    assert pc.cached_predict_point(-118.25, 34.05)[1] == "Low"
+
+    _write_model(model_pkl, "Very High", 2_000_000)
+    assert pc.cached_predict_point(-118.25, 34.05)[1] == "Very High"
+
+    # a new process reading the SQLite tier must see the new label, not a stale row
+    monkeypatch.setattr(pc, "_DEFAULT", pc.PointCache(db_path=db))
+    assert pc.cached_predict_point(-118.25, 34.05)[1] == "Very High"
+    assert pc.default_cache().stats()["hits_db"] == 1
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.risk_rules import label_from_score, label_from_score_batch, rule_score, rule_score_batch
+
+
+def _mixed(n=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    zones = np.array(["A", "AE", "ae", "X", "x", "VE", "D", "", None, np.nan], dtype=object)
+    fires = np.array(["Very High", "very high", "High", "HIGH", "Moderate", "moderate", "Low",
+                      "", None, np.nan], dtype=object)
+    pga = rng.choice([0.0, 0.19, 0.2, 0.34, 0.35, 0.6, np.nan], n)
+    return pd.DataFrame({
+        "fema_zone": rng.choice(zones, n),
+        "fire_class": rng.choice(fires, n),
+        "pga_g": pga,
+        "storm_count_5km": rng.integers(0, 8, n),
+    })
+
+
+def _scalar(df):
+    rows = df.astype(object).where(df.notna(), None).to_dict("records")
+    scores = [rule_score(r) for r in rows]
+    return np.array(scores), np.array([label_from_score(s) for s in scores], dtype=object)
+
+
+@pytest.mark.parametrize("variant", ["float_pga", "object_pga", "categorical"])
+def test_batch_matches_scalar(variant):
+    df = _mixed()
+    if variant == "object_pga":
+        df["pga_g"] = df["pga_g"].astype(object).where(df["pga_g"].notna(), None)
+    elif variant == "categorical":
+        df["fema_zone"] = df["fema_zone"].astype("category")
+        df["fire_class"] = df["fire_class"].astype("category")
+    want_score, want_label = _scalar(_mixed())
+
+    score = rule_score_batch(df)
+    assert np.array_equal(score, want_score)
+    assert np.array_equal(label_from_score_batch(score), want_label)
+
+
+def test_nan_values_score_like_scalar_rules():
+    # the scalar rules see NaN as-is (not None); the batch path must agree
+    row = {"fema_zone": np.nan, "fire_class": np.nan, "pga_g": np.nan, "storm_count_5km": np.nan}
+    assert rule_score_batch(pd.DataFrame([row]))[0] == rule_score(row) == 0
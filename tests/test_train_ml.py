@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from sklearn.utils.class_weight import compute_sample_weight
+
+import src.train_ml as T
+from src.risk_rules import label_from_score_batch, rule_score_batch
+
+
+def _chunks(n_chunks=5, size=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n_chunks):
+        y = rng.choice(4, size, p=[0.97, 0.02, 0.008, 0.002]).astype(np.int8)
+        yield (rng.integers(-1, 2, size), rng.integers(-1, 2, size),
+               rng.random(size).astype(np.float32), rng.integers(0, 6, size), y)
+
+
+def test_reservoir_caps_common_and_keeps_rare_classes():
+    X, y, seen = T.stratified_reservoir(_chunks(), per_class=500)
+    counts = pd.Series(y).value_counts().to_dict()
+    assert sum(seen.values()) == 10_000
+    assert counts[0] == 500
+    for code in (1, 2, 3):
+        assert counts[code] == min(500, seen[T.LABELS[code]])
+    assert X.shape == (len(y), 4)
+
+
+def _rule_labelled(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "fema_zone": rng.choice(["A", "X", "None"], n, p=[.3, .3, .4]),
+        "fire_class": rng.choice(["Very High", "High", "None"], n, p=[.02, .03, .95]),
+        "pga_g": rng.choice([0.0, 0.25, 0.4], n, p=[.6, .3, .1]),
+        "storm_count_5km": rng.choice([0, 2, 6], n, p=[.6, .3, .1]),
+    })
+    return X, label_from_score_batch(rule_score_batch(X.replace("None", None)))
+
+
+def test_hgb_fits_rare_classes_with_balanced_weights():
+    X, y = _rule_labelled()
+    assert pd.Series(y).value_counts().min() < 20
+    pipe = T._make_pipeline("hgb", 1, T._min_leaf(y))
+    pipe.fit(X, y, clf__sample_weight=compute_sample_weight("balanced", y))
+    assert pipe.score(X, y) == 1.0  # labels are a deterministic function of the features
+
+
+def test_warm_start_refuses_other_estimator_type():
+    X, y = _rule_labelled()
+    hgb = T._make_pipeline("hgb", 1, T._min_leaf(y)).fit(X, y)
+    pipe, why = T._warm_start(hgb, "forest", np.unique(y), more=10)
+    assert pipe is None and "HistGradientBoostingClassifier" in why
+
+    pipe, why = T._warm_start(hgb, "hgb", np.unique(y), more=10)
+    assert pipe is hgb and why is None
+    assert hgb.named_steps["clf"].max_iter == 210
+
+
+def test_warm_start_forest_uses_requested_n_jobs():
+    X, y = _rule_labelled()
+    forest = T._make_pipeline("forest", None).fit(X, y)
+    pipe, why = T._warm_start(forest, "forest", np.unique(y), more=10, n_jobs=4)
+    assert pipe is forest and why is None
+    assert forest.named_steps["clf"].get_params()["n_jobs"] == 4
+    assert forest.named_steps["clf"].n_estimators == 230
@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.vector_index import VectorIndex
+
+DOCS = [
+    "Zone A and AE are the 100-year floodplain; elevate structures.",
+    "Very High fire hazard severity zones need defensible space.",
+    "Peak ground acceleration (PGA) measures earthquake shaking.",
+    "Heavy rain and storms: clear gutters and drainage paths.",
+]
+HAZARDS = ["flood", "fire", "quake", "storm"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    vecs = np.eye(len(DOCS), 8, dtype=np.float32)  # chunk i points along axis i
+    np.save(tmp_path / "v.npy", vecs)
+    (tmp_path / "c.json").write_text(json.dumps(
+        {"ids": [f"d{i}" for i in range(len(DOCS))], "docs": DOCS, "hazards": HAZARDS}))
+    return VectorIndex(tmp_path / "v.npy", tmp_path / "c.json")
+
+
+def test_dense_top_k_is_exact(index):
+    q = np.zeros(8)
+    q[2], q[0] = 1.0, 0.5
+    assert [i for _, i, _ in index.search(q, k=2)] == ["d2", "d0"]
+
+
+def test_hazard_filter_and_empty_means_no_filter(index):
+    q = np.zeros(8)
+    q[2] = 1.0
+    assert [i for _, i, _ in index.search(q, k=4, hazards={"fire", "storm"})] == ["d1", "d3"]
+    assert len(index.search(q, k=4, hazards=[])) == 4
+    assert len(index.search(q, k=4, hazards=None)) == 4
+
+
+def test_bm25_blend_only_with_query_text(index):
+    q = np.zeros(8)
+    q[2] = 1.0
+    assert index.search(q, k=1)[0][1] == "d2"
+    assert index.search(q, k=1, query="defensible space fire", alpha=0.3)[0][1] == "d1"
+
+
+def test_mismatched_files_are_rejected(index, tmp_path):
+    np.save(tmp_path / "v.npy", np.eye(len(DOCS) + 1, 8, dtype=np.float32))
+    with pytest.raises(ValueError, match="rag_build"):
+        VectorIndex(tmp_path / "v.npy", tmp_path / "c.json")